@@ -3,6 +3,8 @@ import os
 import cv2
 import yaml
 
+import cross_validation
+import pruner
 import utils
 from logger import Logger
 from node import Node
@@ -23,6 +25,10 @@ class App:
     def load_tree(self):
         """Create or read a tree according to config.yaml."""
 
+        if self.app_config["booleans"]["crossValidate"]:
+            cross_validation.cross_validate(self)
+            return
+
         root = Node(app=self)
         if self.app_config["booleans"]["calculate"]:
             if root.load_from_csv():
@@ -35,11 +41,21 @@ class App:
         else:
             if root.load_from_tree_file():
                 # If successful
+                if not pruner.prune(root):
+                    return
+
                 img = utils.visualize(root)
+                base_name = os.path.basename(
+                    self.app_config['data']['treeFilePath'])
                 if self.app_config["booleans"]["saveImage"]:
-                    base_name = os.path.basename(
-                        self.app_config['data']['treeFilePath'])
                     cv2.imwrite(f"{os.path.splitext(base_name[0])}.jpg", img)
+
+                # Only a pruned tree differs from the file it was read from.
+                # Write it next to the original instead of overwriting it.
+                if self.app_config["booleans"]["saveTree"] and \
+                        self.app_config["pruning"]["method"] != "none":
+                    root.save_to_tree_file(
+                        f"{os.path.splitext(base_name)[0]}_pruned.tree")
             else:
                 self.logger.error(
                     'You need to specify a .tree file if calculate is set to false')
@@ -52,6 +68,9 @@ class App:
             root (Node): Root node of the tree.
         """
         root.create_decision_tree_id3()
+        if not pruner.prune(root):
+            return
+
         img = utils.visualize(root)
         if self.app_config["booleans"]["saveImage"]:
             cv2.imwrite(
@@ -0,0 +1,409 @@
+import copy
+import itertools
+import math
+import multiprocessing
+import random
+import time
+from collections import Counter, defaultdict
+
+import pandas
+
+import encoding
+import pruner
+from node import Node
+
+# Data shared with every worker process of the pool.
+# It is set once per process by init_worker() instead of
+# being sent again with every task.
+_shared = {}
+
+
+def encode(df):
+    """Encode every column of a table into integer codes.
+
+    Codes make hashing and comparing values cheaper than the original
+    strings while the tree structure stays the same.
+
+    Args:
+        df (pandas.DataFrame): Table whose last column is the result.
+
+    Returns:
+        tuple: Column names, a list of code lists, one for every column,
+               and a list of the original values of every code, one for every column.
+    """
+
+    columns = []
+    uniques = []
+    for key in df:
+        codes, values = pandas.factorize(df[key])
+        codes = codes.tolist()
+        values = values.tolist()
+        # Blank cells get the code -1, which would index the last value.
+        # Give them a value of their own, like encoding.normalize() does.
+        if -1 in codes:
+            codes = [len(values) if c == -1 else c for c in codes]
+            values.append(encoding.MISSING)
+        columns.append(codes)
+        uniques.append(values)
+    return list(df.columns), columns, uniques
+
+
+def assign_folds(row_amount, folds, seed):
+    """Shuffle row indices and distribute them into folds.
+
+    Args:
+        row_amount (int): Amount of rows in the table.
+        folds (int): Amount of folds.
+        seed (int): Seed of the shuffle.
+
+    Returns:
+        list: List of row index lists, one for every fold.
+    """
+
+    indices = list(range(row_amount))
+    random.Random(seed).shuffle(indices)
+    return [indices[f::folds] for f in range(folds)]
+
+
+def count_results(names, columns, indices):
+    """Count results for every attribute of every category on the given rows.
+
+    Args:
+        names (list): Column names, the last one is the result column.
+        columns (list): Code lists of every column.
+        indices (list): Indices of rows to be counted.
+
+    Returns:
+        dict: Structure is : {Category: {Atrb0: Counter(results of Atrb0)}}
+    """
+
+    results = columns[-1]
+    counts = {}
+    for name, codes in zip(names[:-1], columns[:-1]):
+        atrb_counts = defaultdict(Counter)
+        for i in indices:
+            atrb_counts[codes[i]][results[i]] += 1
+        counts[name] = dict(atrb_counts)
+    return counts
+
+
+def training_counts(total_counts, fold_counts):
+    """Return the counts of a training set by removing its fold from the total.
+
+    Every fold shares the counts of the whole table, so the root statistics
+    of a training set do not need another pass over its rows.
+
+    Args:
+        total_counts (dict): Counts of the whole table, see count_results().
+        fold_counts (dict): Counts of the held out fold, see count_results().
+
+    Returns:
+        dict: Counts of the training set, see count_results().
+    """
+
+    counts = {}
+    for category, atrb_counts in total_counts.items():
+        counts[category] = {}
+        for atrb, result_counts in atrb_counts.items():
+            remaining = result_counts - fold_counts[category].get(atrb, Counter())
+            # Attributes that only occur in the fold do not occur in training.
+            if remaining:
+                counts[category][atrb] = remaining
+    return counts
+
+
+def fold_lookups(names, columns, uniques, train_indices, encoding_config):
+    """Decide the grouping and hashing of a fold on its training rows only.
+
+    Held out rows must not change which attributes are rare,
+    otherwise their frequencies would leak into training.
+
+    Args:
+        names (list): Column names, the last one is the result column.
+        columns (list): Code lists of every column.
+        uniques (list): Original values of every code, see encode().
+        train_indices (list): Indices of the training rows of the fold.
+        encoding_config (dict): Encoding section of config.yaml.
+
+    Returns:
+        list: For every category, a list that maps a code to its encoded code,
+              or None if the category is not encoded.
+    """
+
+    categories = [(name, [values[codes[i]] for i in train_indices])
+                  for name, codes, values in zip(names[:-1], columns[:-1], uniques[:-1])]
+    fold_encoding = encoding.build_encoding(categories, encoding_config)
+
+    lookups = []
+    for name, values in zip(names[:-1], uniques[:-1]):
+        if name not in fold_encoding:
+            lookups.append(None)
+            continue
+        encoded_codes = {}
+        lookups.append([encoded_codes.setdefault(encoding.encode_value(v, fold_encoding[name]),
+                                                 len(encoded_codes))
+                        for v in values])
+    return lookups
+
+
+def remap_counts(counts, names, lookups):
+    """Merge the counts of codes that are encoded into the same code.
+
+    Args:
+        counts (dict): Counts of raw codes, see count_results().
+        names (list): Column names, the last one is the result column.
+        lookups (list): Encoded code of every code, see fold_lookups().
+
+    Returns:
+        dict: Counts of encoded codes, see count_results().
+    """
+
+    remapped = {}
+    for name, lookup in zip(names[:-1], lookups):
+        if lookup is None:
+            remapped[name] = counts[name]
+            continue
+        atrb_counts = defaultdict(Counter)
+        for atrb, result_counts in counts[name].items():
+            atrb_counts[lookup[atrb]].update(result_counts)
+        remapped[name] = dict(atrb_counts)
+    return remapped
+
+
+def init_worker(app, names, columns, folds, lookups, root_counts):
+    """Store the encoded table and the statistics shared by every task.
+
+    Args:
+        app (App): App whose configuration is the base of every combination.
+        names (list): Column names, the last one is the result column.
+        columns (list): Code lists of every column.
+        folds (list): Row index lists of every fold.
+        lookups (list): Lookups of every fold, see fold_lookups().
+        root_counts (list): Root counts of the training set of every fold.
+    """
+
+    _shared["app"] = app
+    _shared["app_config"] = app.app_config
+    _shared["names"] = names
+    _shared["columns"] = columns
+    _shared["folds"] = folds
+    _shared["lookups"] = lookups
+    _shared["root_counts"] = root_counts
+
+
+def has_path(app_config, path):
+    """Return whether a setting exists in the configuration.
+
+    Args:
+        app_config (dict): Configuration read from config.yaml.
+        path (str): Path of the setting, such as 'id3.maxDepth'.
+
+    Returns:
+        bool: Whether the setting exists.
+    """
+
+    section = app_config
+    for key in path.split('.'):
+        if not isinstance(section, dict) or key not in section:
+            return False
+        section = section[key]
+    return True
+
+
+def apply_params(app_config, params):
+    """Return a copy of the configuration with the given settings applied.
+
+    Args:
+        app_config (dict): Configuration read from config.yaml.
+        params (dict): Settings keyed by their path, such as 'id3.maxDepth'.
+
+    Returns:
+        dict: Copy of the configuration.
+    """
+
+    app_config = copy.deepcopy(app_config)
+    for path, value in params.items():
+        *sections, key = path.split('.')
+        section = app_config
+        for s in sections:
+            section = section[s]
+        section[key] = value
+    return app_config
+
+
+def evaluate(task):
+    """Build a tree on the training set of a fold and evaluate it on the fold.
+
+    Args:
+        task (tuple): Index of the combination, its settings and index of the fold.
+
+    Returns:
+        tuple: Index of the combination, accuracy, node amount and build time.
+    """
+
+    combination, params, fold = task
+    app = _shared["app"]
+    names = _shared["names"]
+    test_indices = _shared["folds"][fold]
+
+    # Apply the grouping and hashing of this fold to the categories.
+    columns = [codes if lookup is None else [lookup[c] for c in codes]
+               for codes, lookup in zip(_shared["columns"], _shared["lookups"][fold])]
+    columns.append(_shared["columns"][-1])
+
+    app.app_config = apply_params(_shared["app_config"], params)
+    held_out = set(test_indices)
+    train_indices = [i for i in range(len(columns[0])) if i not in held_out]
+
+    start = time.perf_counter()
+    root = Node(categories=[(name, [codes[i] for i in train_indices])
+                            for name, codes in zip(names[:-1], columns[:-1])],
+                result=(names[-1], [columns[-1][i] for i in train_indices]),
+                app=app)
+    root.create_decision_tree_id3(counts=_shared["root_counts"][fold])
+    if app.app_config["pruning"]["method"] == "pessimistic":
+        pruner.prune_pessimistic(root)
+    build_time = time.perf_counter() - start
+
+    rows = [{name: codes[i] for name, codes in zip(names, columns)}
+            for i in test_indices]
+    return (combination, pruner.accuracy(root, rows, names[-1]),
+            pruner.count_nodes(root), build_time)
+
+
+def summarize(combinations, outcomes):
+    """Aggregate the outcomes of every fold into a ranked metrics table.
+
+    Args:
+        combinations (list): Settings of every combination.
+        outcomes (list): Outcomes returned by evaluate().
+
+    Returns:
+        pandas.DataFrame: Metrics of every combination, best first.
+    """
+
+    per_combination = defaultdict(list)
+    for combination, acc, nodes, build_time in outcomes:
+        # Empty folds have no accuracy.
+        if acc is not None:
+            per_combination[combination].append((acc, nodes, build_time))
+
+    table = []
+    for combination, params in enumerate(combinations):
+        accs, nodes, build_times = zip(*per_combination[combination])
+        mean = sum(accs) / len(accs)
+        std = math.sqrt(sum((a - mean) ** 2 for a in accs) / len(accs))
+        table.append({**params,
+                      "meanAccuracy": mean,
+                      "stdAccuracy": std,
+                      "meanNodes": sum(nodes) / len(nodes),
+                      "meanBuildTime": sum(build_times) / len(build_times)})
+
+    table = pandas.DataFrame(table)
+    # Prefer smaller trees when accuracies are the same.
+    table = table.sort_values(["meanAccuracy", "meanNodes"],
+                              ascending=[False, True]).reset_index(drop=True)
+    table.index += 1
+    return table
+
+
+def cross_validate(app):
+    """Run k-fold cross-validation for every combination in config.yaml.
+
+    The table is read and encoded once and shared with a pool of worker
+    processes that evaluate every combination on every fold. Grouping and
+    hashing are decided for every fold on its training rows.
+
+    Args:
+        app (App): App whose configuration is used.
+
+    Returns:
+        bool: Whether the cross-validation was successful.
+    """
+
+    prompt = 'CV'
+    cv_config = app.app_config["crossValidation"]
+    grid = cv_config["grid"]
+
+    for path in grid:
+        # A misspelled path would add a setting that nothing reads.
+        if not has_path(app.app_config, path):
+            app.logger.error(
+                f"Setting $'{path}'$ in the grid does not exist in config.yaml", prompt=prompt)
+            return False
+        # Only settings read while evaluating a combination can be swept.
+        # Everything else, such as the encoding of every fold or the
+        # amount of folds, is read once before the sweep starts.
+        if not (path.startswith("id3.") or path == "pruning.method"):
+            app.logger.error(
+                f"Setting $'{path}'$ can not be swept in the grid", prompt=prompt)
+            return False
+
+    keys = list(grid.keys())
+    combinations = [dict(zip(keys, values))
+                    for values in itertools.product(*(grid[k] for k in keys))]
+
+    # Check the method every combination actually uses,
+    # it may come from the base configuration instead of the grid.
+    for params in combinations:
+        method = apply_params(app.app_config, params)["pruning"]["method"]
+        if method == "reducedError":
+            app.logger.error(
+                "$'reducedError'$ pruning needs a holdout file and can not be cross-validated",
+                prompt=prompt)
+            return False
+        if method not in ("none", "pessimistic"):
+            app.logger.error(
+                f"Unknown pruning method $'{method}'$", prompt=prompt)
+            return False
+
+    csv_file_name = app.app_config["data"]["csvFilePath"]
+    app.logger.info(
+        f"Reading table from csv file $'{csv_file_name}'$...", prompt=prompt)
+    names, columns, uniques = encode(pandas.read_csv(csv_file_name))
+
+    fold_amount = cv_config["folds"]
+    if not 2 <= fold_amount <= len(columns[0]):
+        app.logger.error(
+            f"Amount of folds has to be between $2$ and ${len(columns[0])}$", prompt=prompt)
+        return False
+
+    folds = assign_folds(len(columns[0]), fold_amount, cv_config["seed"])
+    total_counts = count_results(names, columns, range(len(columns[0])))
+    lookups = []
+    root_counts = []
+    for fold in folds:
+        held_out = set(fold)
+        train_indices = [i for i in range(len(columns[0])) if i not in held_out]
+        lookups.append(fold_lookups(names, columns, uniques, train_indices,
+                                    app.app_config["encoding"]))
+        counts = training_counts(total_counts, count_results(names, columns, fold))
+        root_counts.append(remap_counts(counts, names, lookups[-1]))
+
+    tasks = [(c, params, f) for c, params in enumerate(combinations)
+             for f in range(fold_amount)]
+    app.logger.info(
+        f"Evaluating ${len(combinations)}$ combinations on ${fold_amount}$ folds...", prompt=prompt)
+
+    # Workers log nothing, there would be too many interleaved messages.
+    worker_app = copy.copy(app)
+    worker_app.app_config = apply_params(app.app_config,
+                                         {"booleans.verbose": False})
+    worker_app.logger = copy.copy(app.logger)
+    worker_app.logger.app = worker_app
+
+    with multiprocessing.Pool(cv_config["processes"] or None,
+                              initializer=init_worker,
+                              initargs=(worker_app, names, columns, folds, lookups, root_counts)) as pool:
+        outcomes = pool.map(evaluate, tasks)
+
+    table = summarize(combinations, outcomes)
+    app.logger.log(f"Ranked results:\n{table.to_string()}",
+                   app.app_config["colors"]["infoColor"],
+                   prompt=prompt, bypass_verbose=True)
+
+    if cv_config["resultsFilePath"]:
+        table.to_csv(cv_config["resultsFilePath"], index_label="rank")
+        app.logger.info(
+            f"Wrote results to $'{cv_config['resultsFilePath']}'$", prompt=prompt)
+    return True
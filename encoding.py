@@ -0,0 +1,173 @@
+import math
+import zlib
+from collections import Counter
+
+# Value that every rare attribute of a category is grouped into.
+OTHER = "__other__"
+# Value that every blank cell of a category is treated as.
+MISSING = "__missing__"
+
+
+def normalize(value):
+    """Return the value in the form that is counted, looked up and hashed.
+
+    pandas reads a numeric column as floats when it has a blank cell,
+    so 1.0 has to be treated like 1 to stay in the same bucket.
+    Blank cells are read as NaN, which is not equal to itself,
+    so every blank cell is turned into MISSING to be counted as one value.
+
+    Args:
+        value (any): Value to be normalized.
+
+    Returns:
+        any: MISSING for blank cells, integral floats as int,
+             every other value unchanged.
+    """
+
+    if value is None:
+        return MISSING
+    if isinstance(value, float):
+        if math.isnan(value):
+            return MISSING
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def hash_bucket(value, buckets):
+    """Return the bucket of a value.
+
+    crc32 is used instead of hash() because hash() of strings
+    changes between runs, but the buckets are saved in .tree files.
+
+    Args:
+        value (any): Normalized value to be hashed, see normalize().
+        buckets (int): Amount of buckets.
+
+    Returns:
+        str: Name of the bucket.
+    """
+
+    return f"#{zlib.crc32(str(value).encode('utf-8')) % buckets}"
+
+
+def build_encoding(categories, encoding_config):
+    """Decide how the attributes of every category are grouped.
+
+    Categories with more distinct attributes than hashBuckets are hashed.
+    Otherwise attributes that occur less than minFrequency times are grouped
+    into OTHER. Categories that need neither are left out.
+
+    Args:
+        categories (list): Columns of data except the result column.
+        encoding_config (dict): Encoding section of config.yaml.
+
+    Returns:
+        dict: Mapping for every encoded category.
+              Structure is : {Category: {"buckets": 8}} for hashing,
+              {Category: {"kept": {Atrb0, Atrb1}}} for grouping.
+    """
+
+    min_frequency = encoding_config["minFrequency"]
+    hash_buckets = encoding_config["hashBuckets"]
+
+    encoding = {}
+    for category, atrb_list in categories:
+        atrb_amounts = Counter(normalize(a) for a in atrb_list)
+        if hash_buckets and len(atrb_amounts) > hash_buckets:
+            encoding[category] = {"buckets": hash_buckets}
+        elif min_frequency:
+            kept = {a for a, amount in atrb_amounts.items()
+                    if amount >= min_frequency}
+            if len(kept) < len(atrb_amounts):
+                encoding[category] = {"kept": kept}
+    return encoding
+
+
+def encode_value(value, mapping):
+    """Return the value that an attribute is replaced with.
+
+    Args:
+        value (any): Attribute to be encoded.
+        mapping (dict): Mapping of the category, see build_encoding().
+
+    Returns:
+        any: Encoded attribute.
+    """
+
+    value = normalize(value)
+    if "buckets" in mapping:
+        return hash_bucket(value, mapping["buckets"])
+    if value in mapping["kept"]:
+        return value
+    return OTHER
+
+
+def apply_encoding(categories, encoding):
+    """Return the categories with every mapping of the encoding applied.
+
+    Args:
+        categories (list): Columns of data except the result column.
+        encoding (dict): Mapping for every encoded category, see build_encoding().
+
+    Returns:
+        list: Encoded columns of data.
+    """
+
+    encoded = []
+    for category, atrb_list in categories:
+        if category in encoding:
+            atrb_list = [encode_value(a, encoding[category])
+                         for a in atrb_list]
+        encoded.append((category, atrb_list))
+    return encoded
+
+
+def encode_row(row, encoding):
+    """Return a copy of a row with every mapping of the encoding applied.
+
+    Args:
+        row (dict): Values of the row keyed by category name.
+        encoding (dict): Mapping for every encoded category, see build_encoding().
+
+    Returns:
+        dict: Encoded row.
+    """
+
+    row = dict(row)
+    for category, mapping in encoding.items():
+        if category in row:
+            row[category] = encode_value(row[category], mapping)
+    return row
+
+
+def to_data(encoding):
+    """Return the encoding in a form that can be written to JSON.
+
+    Args:
+        encoding (dict): Mapping for every encoded category, see build_encoding().
+
+    Returns:
+        dict: Encoding with kept attributes as lists.
+    """
+
+    # Sorted so that the same table always gives the same .tree file.
+    return {category: {"kept": sorted(mapping["kept"], key=str)} if "kept" in mapping else mapping
+            for category, mapping in encoding.items()}
+
+
+def from_data(data):
+    """Return the encoding read from JSON, see to_data().
+
+    Kept attributes are turned back into sets once, so that
+    looking them up does not depend on how many there are.
+
+    Args:
+        data (dict): Encoding with kept attributes as lists.
+
+    Returns:
+        dict: Mapping for every encoded category, see build_encoding().
+    """
+
+    return {category: {"kept": set(mapping["kept"])} if "kept" in mapping else mapping
+            for category, mapping in data.items()}
@@ -3,6 +3,7 @@ from collections import defaultdict
 
 import pandas
 
+import encoding
 import utils
 
 
@@ -25,6 +26,8 @@ class Node:
         self.positive_value = positive_value
         self.value = None
         self.split = None
+        # Mapping of grouped or hashed attributes, only set on the root.
+        self.encoding = None
 
     def load_from_csv(self):
         """Load data into a Node object from a .csv file.
@@ -42,6 +45,17 @@ class Node:
         self.categories = [(key, df[key].to_list()) for key in df][:-1]
         self.result = (df.iloc[:, -1].name, df.iloc[:, -1].to_list())
 
+        # Group rare attributes or hash them into buckets
+        # to put an upper bound on the amount of children.
+        self.encoding = encoding.build_encoding(
+            self.categories, self.app.app_config["encoding"])
+        self.categories = encoding.apply_encoding(
+            self.categories, self.encoding)
+        for category in self.encoding:
+            self.app.logger.info(
+                f"Encoded attributes of $'{category}'$ into ${len(set(self.attributes_of(category)))}$ values",
+                prompt=prompt)
+
         if self.app.app_config["data"]["positiveValue"] not in self.result[1]:
             self.app.logger.error(
                 f"Positive value $'{self.app.app_config['data']['positiveValue']}'$ was not present in any row of result. " +
@@ -113,9 +127,14 @@ class Node:
 
         return child_categories, child_results
 
-    def calculate_entropies_and_probabilites(self):
+    def calculate_entropies_and_probabilites(self, counts=None):
         """Calculate entropies ans probabilities for attributes of categories
         and assign them to instance fields.
+
+        Args:
+            counts (dict, optional): Precomputed result counts for attributes.
+                Structure is : {Category: {Atrb0: Counter(results of Atrb0)}}.
+                If given, the columns are not scanned again. Defaults to None.
         """
 
         prompt = 'ID3'
@@ -134,6 +153,19 @@ class Node:
         # category is a string that holds the title
         # atrb_list is a list that holds the attributes of that category in order.
         for category, atrb_list in self.categories:
+            if counts is not None:
+                # Every result counted for an attribute is a row of this node.
+                atrb_list_len = sum(sum(c.values())
+                                    for c in counts[category].values())
+                for atrb, result_counts in counts[category].items():
+                    self.entropies[category][atrb] = utils.entropy_from_counts(
+                        result_counts)
+                    self.probabilities[category][atrb] = sum(
+                        result_counts.values()) / atrb_list_len
+                self.app.logger.info(
+                    f"Reused entropies and probabilities for $'{category}'$", prompt=prompt)
+                continue
+
             # Hold results for an attribute in a category
             atrb_results = defaultdict(list)
             # Hold the length of atrb_list
@@ -191,11 +223,16 @@ class Node:
         self.app.logger.info(f"Maximum information gain was on $'{self.max_gain[0]}'$ with ${self.max_gain[1]}$",
                              prompt=prompt)
 
-    def create_decision_tree_id3(self):
+    def create_decision_tree_id3(self, depth=0, counts=None):
         """Create a tree structure that represents a decision tree with the ID3 algorithm.
 
         Detailed explanation of the ID3 algorithm: https://en.wikipedia.org/wiki/ID3_algorithm#Algorithm
         Brief explanations are made through block comments.
+
+        Args:
+            depth (int, optional): Depth of this node, root is 0. Defaults to 0.
+            counts (dict, optional): Precomputed result counts for the attributes
+                of this node, see calculate_entropies_and_probabilites(). Defaults to None.
         """
 
         prompt = "ID3"
@@ -207,10 +244,18 @@ class Node:
                 "Stopped splitting because all attributes were same.", prompt=prompt)
             return
 
+        # If the maximum depth is reached, stop recursion.
+        # Zero means the depth is unlimited.
+        max_depth = self.app.app_config["id3"]["maxDepth"]
+        if max_depth and depth >= max_depth:
+            self.app.logger.info(
+                "Stopped splitting because maximum depth was reached.", prompt=prompt)
+            return
+
         # Result is the last column of the table and answer of the problem.
         result_title, results = self.result
 
-        self.calculate_entropies_and_probabilites()
+        self.calculate_entropies_and_probabilites(counts)
 
         # Hold the entropy of the result list.
         self.result_entropy = utils.entropy(results)
@@ -240,7 +285,32 @@ class Node:
             t.value = child
             self.children.append(t)
             # Continue recursion with child
-            t.create_decision_tree_id3()
+            t.create_decision_tree_id3(depth + 1)
+
+    def predict(self, row, encoded=False):
+        """Predict the result of a row by walking down the tree.
+
+        If the row has a value that was never seen in the training data
+        of a node, the majority result of that node is returned.
+
+        Args:
+            row (dict): Values of the row keyed by category name.
+            encoded (bool, optional): Whether the encoding of the tree was already
+                applied to the row. Defaults to False.
+
+        Returns:
+            any: Predicted value of the result column.
+        """
+
+        if self.encoding and not encoded:
+            row = encoding.encode_row(row, self.encoding)
+
+        if self.split is not None:
+            for c in self.children:
+                if c.value == row.get(self.split):
+                    return c.predict(row, encoded=True)
+
+        return utils.majority_of(self.result[1])
 
     def save_to_tree_file(self, file_name):
         """Write the tree whose root is this node to a JSON file.
@@ -254,7 +324,7 @@ class Node:
             file_name (str): Name of file to be written to.
         """
         with open(file_name, "w") as file:
-            json.dump(self.get_node_data(), file)
+            json.dump(self.get_tree_data(), file)
 
     def load_from_data(self, data):
         """Load the node and its children from a dictionary.
@@ -276,6 +346,9 @@ class Node:
         self.split = data["split"]
         self.result = tuple(data["result"])
         self.positive_value = data["positive_value"]
+        # Only the root has an encoding, older .tree files have none.
+        if data.get("encoding") is not None:
+            self.encoding = encoding.from_data(data["encoding"])
         for c in data["children"]:
             child = Node(parent=self)
             # Continue recursion
@@ -312,3 +385,15 @@ class Node:
                 "result": self.result,
                 "positive_value": self.positive_value,
                 "children": [c.get_node_data() for c in self.children]}
+
+    def get_tree_data(self):
+        """Form and return the content of a .tree file whose root is this node.
+
+        Returns:
+            dictionary: Information about every node and the encoding of the tree.
+        """
+        data = self.get_node_data()
+        # Prediction with a loaded tree needs the same encoding.
+        data["encoding"] = encoding.to_data(
+            self.encoding) if self.encoding is not None else None
+        return data
@@ -0,0 +1,247 @@
+import json
+import math
+
+import pandas
+
+import encoding
+import utils
+
+
+def count_nodes(node):
+    """Return the amount of nodes in the tree whose root is the given node.
+
+    Args:
+        node (Node): Root node of the tree.
+
+    Returns:
+        int: Amount of nodes in the tree.
+    """
+
+    return 1 + sum(count_nodes(c) for c in node.children)
+
+
+def serialized_size(node):
+    """Return the size of the tree as it would be written to a .tree file.
+
+    Args:
+        node (Node): Root node of the tree.
+
+    Returns:
+        int: Size of the serialized tree in bytes.
+    """
+
+    return len(json.dumps(node.get_tree_data()).encode("utf-8"))
+
+
+def accuracy(node, rows, result_title):
+    """Return the ratio of rows whose result is predicted correctly.
+
+    Args:
+        node (Node): Root node of the tree.
+        rows (list): Encoded rows as dictionaries keyed by column name.
+        result_title (str): Name of the result column.
+
+    Returns:
+        float: Accuracy of the tree on the rows, None if there are no rows.
+    """
+
+    if not rows:
+        return None
+    correct = sum(1 for row in rows
+                  if node.predict(row, encoded=True) == row[result_title])
+    return correct / len(rows)
+
+
+def read_rows(csv_file_name):
+    """Read a .csv file into a list of rows.
+
+    Args:
+        csv_file_name (str): Path of the .csv file.
+
+    Returns:
+        list: Rows as dictionaries keyed by column name.
+    """
+
+    return pandas.read_csv(csv_file_name).to_dict("records")
+
+
+def collapse(node):
+    """Turn a node into a leaf that predicts its majority result.
+
+    Subtrees below the node are dropped so that they can be garbage collected.
+
+    Args:
+        node (Node): Node to be collapsed.
+    """
+
+    node.children = []
+    node.split = None
+
+
+def compact(node):
+    """Release the tables that were only needed to build the tree.
+
+    Every node keeps a copy of its part of the table and the statistics
+    calculated from it. Only the result column is needed afterwards,
+    for prediction and visualization.
+
+    Args:
+        node (Node): Root node of the (sub)tree.
+    """
+
+    for field in ("categories", "entropies", "probabilities", "max_gain"):
+        if hasattr(node, field):
+            setattr(node, field, None)
+    for c in node.children:
+        compact(c)
+
+
+def leaf_errors(node, results):
+    """Return the amount of results that the majority of the node gets wrong.
+
+    Args:
+        node (Node): Node whose majority result is used.
+        results (list): Actual results.
+
+    Returns:
+        int: Amount of misclassified results.
+    """
+
+    majority = utils.majority_of(node.result[1])
+    return sum(1 for r in results if r != majority)
+
+
+def prune_reduced_error(node, rows, result_title):
+    """Prune the tree bottom-up with reduced-error pruning.
+
+    A subtree is replaced by a majority leaf if the leaf does not make more
+    mistakes on the holdout rows that reach it than the subtree does.
+
+    Args:
+        node (Node): Root node of the (sub)tree.
+        rows (list): Holdout rows that reach this node.
+        result_title (str): Name of the result column.
+
+    Returns:
+        int: Amount of holdout errors of the (possibly pruned) subtree.
+    """
+
+    errors_as_leaf = leaf_errors(node, [row[result_title] for row in rows])
+    if not node.children:
+        return errors_as_leaf
+
+    # Route every holdout row to the child that matches its value.
+    # Rows with unseen values are predicted by this node's majority.
+    child_rows = {id(c): [] for c in node.children}
+    unmatched = []
+    for row in rows:
+        for c in node.children:
+            if c.value == row.get(node.split):
+                child_rows[id(c)].append(row)
+                break
+        else:
+            unmatched.append(row)
+
+    errors_as_subtree = leaf_errors(node, [row[result_title] for row in unmatched])
+    for c in node.children:
+        errors_as_subtree += prune_reduced_error(
+            c, child_rows[id(c)], result_title)
+
+    if errors_as_leaf <= errors_as_subtree:
+        collapse(node)
+        return errors_as_leaf
+    return errors_as_subtree
+
+
+def prune_pessimistic(node):
+    """Prune the tree bottom-up with pessimistic error pruning.
+
+    Training errors are corrected by 0.5 per leaf. A subtree is replaced by
+    a majority leaf if the corrected error of the leaf is not larger than
+    the corrected error of the subtree plus one standard error.
+
+    Args:
+        node (Node): Root node of the (sub)tree.
+
+    Returns:
+        tuple: Corrected error and leaf amount of the (possibly pruned) subtree.
+    """
+
+    errors_as_leaf = leaf_errors(node, node.result[1]) + 0.5
+    if not node.children:
+        return errors_as_leaf, 1
+
+    errors_as_subtree = 0
+    leaves = 0
+    for c in node.children:
+        child_errors, child_leaves = prune_pessimistic(c)
+        errors_as_subtree += child_errors
+        leaves += child_leaves
+
+    n = len(node.result[1])
+    standard_error = math.sqrt(
+        max(errors_as_subtree * (n - errors_as_subtree), 0) / n) if n else 0
+
+    if errors_as_leaf <= errors_as_subtree + standard_error:
+        collapse(node)
+        return errors_as_leaf, 1
+    return errors_as_subtree, leaves
+
+
+def prune(root):
+    """Prune the tree according to config.yaml and log a report.
+
+    Args:
+        root (Node): Root node of the tree.
+
+    Returns:
+        bool: Whether the pruning was successful.
+    """
+
+    prompt = 'PRUNER'
+    app = root.app
+    method = app.app_config["pruning"]["method"]
+    holdout_path = app.app_config["pruning"]["holdoutCsvFilePath"]
+
+    if method == "none":
+        return True
+    if method not in ("reducedError", "pessimistic"):
+        app.logger.error(
+            f"Unknown pruning method $'{method}'$", prompt=prompt)
+        return False
+    if method == "reducedError" and not holdout_path:
+        app.logger.error(
+            'You need to specify a holdout .csv file for reduced-error pruning', prompt=prompt)
+        return False
+
+    rows = []
+    if holdout_path:
+        app.logger.info(
+            f"Reading holdout table from csv file $'{holdout_path}'$...", prompt=prompt)
+        rows = read_rows(holdout_path)
+        if root.encoding:
+            rows = [encoding.encode_row(row, root.encoding) for row in rows]
+
+    result_title = root.result[0]
+    nodes_before = count_nodes(root)
+    size_before = serialized_size(root)
+    accuracy_before = accuracy(root, rows, result_title)
+
+    if method == "reducedError":
+        prune_reduced_error(root, rows, result_title)
+    else:
+        prune_pessimistic(root)
+    compact(root)
+
+    nodes_after = count_nodes(root)
+    size_after = serialized_size(root)
+    accuracy_after = accuracy(root, rows, result_title)
+
+    app.logger.info(
+        f"Pruned with $'{method}'$: nodes ${nodes_before}$ -> ${nodes_after}$, " +
+        f"size ${size_before}$ -> ${size_after}$ bytes", prompt=prompt)
+    if accuracy_before is not None:
+        app.logger.info(
+            f"Holdout accuracy ${accuracy_before:.4f}$ -> ${accuracy_after:.4f}$ " +
+            f"(delta ${accuracy_after - accuracy_before:+.4f}$)", prompt=prompt)
+    return True
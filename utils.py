@@ -1,6 +1,6 @@
 import math
 import os
-from collections import defaultdict
+from collections import Counter, defaultdict
 
 import cv2
 import numpy as np
@@ -26,6 +26,23 @@ def ratio_of(element, list_):
     return count / len(list_)
 
 
+def majority_of(list_):
+    """Return the most common element in an iterable.
+
+    Ties are broken by the order of first occurrence.
+
+    Args:
+        list_ (list): List whose most common element will be returned.
+
+    Returns:
+        any: Most common element of the list, None if the list is empty.
+    """
+
+    if not list_:
+        return None
+    return Counter(list_).most_common(1)[0][0]
+
+
 def draw_text_center(img, text, center_pos, font_size, thickness):
     """Draw a text to an image whose center is the given position.
 
@@ -225,6 +242,24 @@ def entropy(data_list):
     return summation
 
 
+def entropy_from_counts(counts):
+    """Calculate and return the entropy from occurrence amounts of elements.
+
+    Args:
+        counts (dict): Amount of occurrence for every element.
+
+    Returns:
+        float: Entropy of the counted elements.
+    """
+    list_length = sum(counts.values())
+    summation = 0
+    for amount in counts.values():
+        if amount:
+            element_p = amount / list_length
+            summation += -element_p * math.log2(element_p)
+    return summation
+
+
 def info_gain(entropies, probabilities, result_entropy):
     """Calculate information gain from given data.
 